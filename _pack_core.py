@@ -0,0 +1,80 @@
+import numpy as np
+from numba import njit, prange
+
+# Corner coordinates are packed three to a uint64 in 21-bit lanes
+# (enough for any container measured in cm). Each placed box is two
+# words: min corner and max corner.
+_LANE = 21
+_MASK = np.uint64((1 << _LANE) - 1)
+
+
+@njit(cache=True)
+def pack_corner(x, y, z):
+    """Pack integer (x, y, z) into one uint64 with 21-bit lanes."""
+    return (np.uint64(x) | (np.uint64(y) << np.uint64(_LANE))
+            | (np.uint64(z) << np.uint64(2 * _LANE)))
+
+
+@njit(cache=True, parallel=True)
+def find_placement(positions, dims, packed_lo, packed_hi, L, W, H):
+    """Score every valid candidate position and return the best fit.
+
+    positions : (M, 3) int64 candidate corner points.
+    dims      : (K, 3) int64 (length, width, height) per allowed orientation.
+    packed_lo : (N,) uint64 packed min corners of placed items.
+    packed_hi : (N,) uint64 packed max corners of placed items.
+
+    Candidates are scored by lowest-left-bottom preference in the
+    container's (x, z, y) placement order; the minimum wins. Returns
+    (position_index, orientation_index), or (-1, -1) if nothing fits.
+
+    The weight budget and coarse bounds rejection are handled by the
+    caller before candidates reach this kernel.
+    """
+    shift = np.uint64(_LANE)
+    shift2 = np.uint64(2 * _LANE)
+    n_pos = positions.shape[0]
+    n_orient = dims.shape[0]
+    n_box = packed_lo.shape[0]
+    # Exact lexicographic (x, z, y) score packed into an int64: the
+    # coordinates fit 21-bit lanes, so the shifts never collide. A float
+    # weighting would silently misorder once z or y reached 1000.
+    no_fit = np.int64(np.iinfo(np.int64).max)
+    scores = np.full(n_pos, no_fit)
+    orients = np.full(n_pos, -1, dtype=np.int64)
+    for p in prange(n_pos):
+        x = positions[p, 0]
+        y = positions[p, 1]
+        z = positions[p, 2]
+        for o in range(n_orient):
+            x1 = x + dims[o, 0]
+            y1 = y + dims[o, 1]
+            z1 = z + dims[o, 2]
+            if x1 > L or y1 > W or z1 > H:
+                continue
+            ok = True
+            for b in range(n_box):
+                lo = packed_lo[b]
+                hi = packed_hi[b]
+                # Test axes in x, z, y order: the container is longest
+                # along x (and taller than it is wide by default), so
+                # most boxes separate on the first axis and the
+                # remaining lanes never get unpacked. Each per-axis
+                # pair still folds with a branchless OR.
+                if (x1 <= np.int64(lo & _MASK)) | (x >= np.int64(hi & _MASK)):
+                    continue
+                if (z1 <= np.int64(lo >> shift2)) | (z >= np.int64(hi >> shift2)):
+                    continue
+                if ((y1 <= np.int64((lo >> shift) & _MASK)) |
+                        (y >= np.int64((hi >> shift) & _MASK))):
+                    continue
+                ok = False
+                break
+            if ok:
+                scores[p] = (x << np.int64(2 * _LANE)) | (z << np.int64(_LANE)) | y
+                orients[p] = o
+                break
+    best = np.argmin(scores)
+    if orients[best] < 0:
+        return -1, -1
+    return best, orients[best]
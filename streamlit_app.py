@@ -1,11 +1,24 @@
 import streamlit as st
-import copy
 from typing import List
+import numpy as np
 import plotly.graph_objects as go
 
+from _pack_core import find_placement, pack_corner
+
 # ===================== MODELS =====================
 
+# Orientation names in the order their dimension tuples are precomputed.
+ORIENTATIONS = ("lwh", "lhw", "wlh", "whl", "hlw", "hwl")
+ORIENT_MAP = {name: i for i, name in enumerate(ORIENTATIONS)}
+
+
 class Item:
+    __slots__ = ("name", "item_type", "original_dims", "length", "width",
+                 "height", "weight", "quantity", "orientation_preference",
+                 "fragile", "can_stack", "can_stack_same_type", "position",
+                 "rotation", "color", "_orient_dims", "_orient_idx",
+                 "_volume")
+
     def __init__(self, name, length, width, height, weight, quantity=1,
                  orientation_preference=None, fragile=False,
                  can_stack=True, can_stack_same_type=True,
@@ -25,25 +38,40 @@ class Item:
         self.position = None
         self.rotation = None
         self.color = color
+        l, w, h = length, width, height
+        self._orient_dims = ((l, w, h), (l, h, w), (w, l, h),
+                             (w, h, l), (h, l, w), (h, w, l))
+        self._orient_idx = tuple(ORIENT_MAP[o]
+                                 for o in self.orientation_preference)
+        self._volume = length * width * height
 
-    def get_dimensions(self, orientation):
-        l, w, h = self.original_dims
-        return {
-            "lwh": (l, w, h),
-            "lhw": (l, h, w),
-            "wlh": (w, l, h),
-            "whl": (w, h, l),
-            "hlw": (h, l, w),
-            "hwl": (h, w, l),
-        }[orientation]
-
-    def set_orientation(self, orientation):
-        self.length, self.width, self.height = self.get_dimensions(orientation)
-        self.rotation = orientation
+    def set_orientation(self, idx):
+        self.length, self.width, self.height = self._orient_dims[idx]
+        self.rotation = idx
 
     def get_volume(self):
-        l, w, h = self.original_dims
-        return l * w * h
+        return self._volume
+
+    def clone(self, name):
+        """Fast single-unit copy used when expanding quantities in pack()."""
+        n = Item.__new__(Item)
+        n.name = name
+        n.item_type = self.item_type
+        n.original_dims = self.original_dims
+        n.length, n.width, n.height = self.original_dims
+        n.weight = self.weight
+        n.quantity = 1
+        n.orientation_preference = self.orientation_preference
+        n.fragile = self.fragile
+        n.can_stack = self.can_stack
+        n.can_stack_same_type = self.can_stack_same_type
+        n.position = None
+        n.rotation = None
+        n.color = self.color
+        n._orient_dims = self._orient_dims
+        n._orient_idx = self._orient_idx
+        n._volume = self._volume
+        return n
 
 
 class Container:
@@ -54,30 +82,100 @@ class Container:
         self.max_weight = max_weight
         self.items = []
         self.current_weight = 0
-
-    def check_overlap(self, item, x, y, z, other):
-        px, py, pz = other.position
-        return not (
-            x + item.length <= px or x >= px + other.length or
-            y + item.width <= py or y >= py + other.width or
-            z + item.height <= pz or z >= pz + other.height
-        )
-
-    def is_valid(self, item, x, y, z):
-        if x + item.length > self.length: return False
-        if y + item.width > self.width: return False
-        if z + item.height > self.height: return False
-        if self.current_weight + item.weight > self.max_weight: return False
-
-        for other in self.items:
-            if self.check_overlap(item, x, y, z, other):
-                return False
-        return True
+        # AABBs of placed items as (x0, y0, z0, x1, y1, z1) rows, so overlap
+        # checks run as one vectorized pass instead of a Python loop.
+        self._bboxes = np.empty((0, 6), dtype=np.float32)
+        # The same AABBs with integer corners packed into uint64 words
+        # (21-bit lanes), consumed by the jitted search kernel.
+        self._packed_lo = np.empty(0, dtype=np.uint64)
+        self._packed_hi = np.empty(0, dtype=np.uint64)
+        # Candidate corner points live in a preallocated buffer grown by
+        # doubling; rows are sorted into (x, z, y) placement order and
+        # deduplicated lazily when _positions is read.
+        self._pos_buf = np.zeros((8, 3), dtype=np.int64)
+        self._pos_len = 1  # row 0 is the origin
+        self._pos_sorted = True
+
+    @property
+    def _positions(self):
+        """Current candidate positions as a sorted, unique (M, 3) view."""
+        if not self._pos_sorted:
+            pos = self._pos_buf[:self._pos_len]
+            pos = pos[np.lexsort((pos[:, 1], pos[:, 2], pos[:, 0]))]
+            dup = np.concatenate(([False],
+                                  np.all(pos[1:] == pos[:-1], axis=1)))
+            pos = pos[~dup]
+            self._pos_buf[:pos.shape[0]] = pos
+            self._pos_len = pos.shape[0]
+            self._pos_sorted = True
+        return self._pos_buf[:self._pos_len]
+
+    def _supported(self, px, py, pz):
+        """True if a point rests on the floor or on a placed item's top
+        face at exactly its height."""
+        if pz == 0:
+            return True
+        b = self._bboxes
+        return bool(np.any((b[:, 5] == pz) &
+                           (b[:, 0] <= px) & (px < b[:, 3]) &
+                           (b[:, 1] <= py) & (py < b[:, 4])))
+
+    def _settle(self, px, py, pz):
+        """Shift a corner point to lower x, then y, then z until it rests
+        against a placed item's face or the container wall. A lateral
+        shift only stands while the point stays in its supporting plane
+        (dominance holds only there); otherwise the original coordinate
+        is kept so elevated stacking spots survive. Dominated candidates
+        collapse onto the same point and are dropped by the duplicate
+        check in add_item."""
+        b = self._bboxes
+        if not b.shape[0]:
+            return 0, 0, 0
+        in_y = (b[:, 1] <= py) & (py < b[:, 4])
+        in_z = (b[:, 2] <= pz) & (pz < b[:, 5])
+        faces = b[in_y & in_z & (b[:, 3] <= px), 3]
+        nx = int(faces.max()) if faces.size else 0
+        if nx != px and self._supported(nx, py, pz):
+            px = nx
+        in_x = (b[:, 0] <= px) & (px < b[:, 3])
+        faces = b[in_x & in_z & (b[:, 4] <= py), 4]
+        ny = int(faces.max()) if faces.size else 0
+        if ny != py and self._supported(px, ny, pz):
+            py = ny
+        in_y = (b[:, 1] <= py) & (py < b[:, 4])
+        faces = b[in_x & in_y & (b[:, 5] <= pz), 5]
+        pz = int(faces.max()) if faces.size else 0
+        return px, py, pz
 
     def add_item(self, item, x, y, z):
         item.position = (x, y, z)
         self.items.append(item)
         self.current_weight += item.weight
+        box = np.array([[x, y, z,
+                         x + item.length, y + item.width, z + item.height]],
+                       dtype=np.float32)
+        self._bboxes = np.vstack((self._bboxes, box))
+        self._packed_lo = np.append(
+            self._packed_lo, np.uint64(pack_corner(x, y, z)))
+        self._packed_hi = np.append(
+            self._packed_hi,
+            np.uint64(pack_corner(x + item.length, y + item.width,
+                                  z + item.height)))
+        buf = self._pos_buf
+        n = self._pos_len
+        hit = np.nonzero((buf[:n, 0] == x) & (buf[:n, 1] == y) &
+                         (buf[:n, 2] == z))[0]
+        if hit.size:
+            n -= 1
+            buf[hit[0]] = buf[n]
+        if n + 3 > buf.shape[0]:
+            buf = np.vstack((buf, np.zeros_like(buf)))
+            self._pos_buf = buf
+        buf[n] = self._settle(x + item.length, y, z)
+        buf[n + 1] = self._settle(x, y + item.width, z)
+        buf[n + 2] = self._settle(x, y, z + item.height)
+        self._pos_len = n + 3
+        self._pos_sorted = False
 
 
 # ===================== PACKER =====================
@@ -86,57 +184,69 @@ class BinPacker:
     def __init__(self, L, W, H, max_weight):
         self.container = Container(L, W, H, max_weight)
 
-    def generate_positions(self):
-        pos = {(0,0,0)}
-        for it in self.container.items:
-            x,y,z = it.position
-            pos.add((x+it.length, y, z))
-            pos.add((x, y+it.width, z))
-            pos.add((x, y, z+it.height))
-        return sorted(pos, key=lambda p:(p[0], p[2], p[1]))
-
     def pack(self, items: List[Item]):
         expanded=[]
         for it in items:
             for i in range(it.quantity):
-                new=copy.deepcopy(it)
-                new.quantity=1
-                new.name=f"{it.name}_{i+1}"
-                expanded.append(new)
-
-        expanded.sort(key=lambda x:(-x.weight, -x.get_volume()))
-
+                expanded.append(it.clone(f"{it.name}_{i+1}"))
+
+        # Heaviest first, then largest: one C-level lexsort over flat
+        # arrays instead of building a Python key tuple per item.
+        weights = np.array([it.weight for it in expanded])
+        vols = np.array([it._volume for it in expanded])
+        order = np.lexsort((-vols, -weights))
+        expanded = [expanded[i] for i in order]
+
+        c = self.container
+        L, W, H, MW = c.length, c.width, c.height, c.max_weight
+        # All allowed orientations go to the kernel as one (K, 3) array
+        # and are evaluated in the same pass; clones of the same item
+        # share that array instead of rebuilding it per unit.
+        dims_cache = {}
         for item in expanded:
-            placed=False
-            for x,y,z in self.generate_positions():
-                for o in item.orientation_preference:
-                    item.set_orientation(o)
-                    if self.container.is_valid(item,x,y,z):
-                        self.container.add_item(item,x,y,z)
-                        placed=True
-                        break
-                if placed: break
+            if c.current_weight + item.weight > MW:
+                continue
+            key = (item._orient_dims, item._orient_idx)
+            dims = dims_cache.get(key)
+            if dims is None:
+                dims = np.array([item._orient_dims[i]
+                                 for i in item._orient_idx], dtype=np.int64)
+                dims_cache[key] = dims
+            # Drop candidates that cannot fit even the item's smallest
+            # extent per axis before the kernel sees them.
+            pos = c._positions
+            dmin = dims.min(axis=0)
+            positions = pos[(pos[:, 0] + dmin[0] <= L) &
+                            (pos[:, 1] + dmin[1] <= W) &
+                            (pos[:, 2] + dmin[2] <= H)]
+            if not positions.shape[0]:
+                continue
+            p, o = find_placement(positions, dims,
+                                  c._packed_lo, c._packed_hi, L, W, H)
+            if p >= 0:
+                item.set_orientation(item._orient_idx[o])
+                x, y, z = positions[p]
+                c.add_item(item, int(x), int(y), int(z))
         return self.container
 
 
 # ===================== VISUALIZATION =====================
 
+# Triangle indices and unit-cube corners shared by every box; only the
+# origin and extents vary per box.
+_I = np.array([0, 0, 0, 1, 2, 4, 4, 6, 0, 1, 2, 4])
+_J = np.array([1, 2, 4, 2, 3, 5, 6, 7, 4, 5, 6, 5])
+_K = np.array([2, 3, 5, 3, 7, 6, 7, 3, 5, 6, 7, 7])
+_UNIT = np.array([[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0],
+                  [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1]], dtype=float)
+
+
 def draw_box(x, y, z, length, width, height, color, name="", show_legend=True):
     """Draw a 3D box with proper faces and edges"""
-    vertices = [
-        [x, x+length, x+length, x, x, x+length, x+length, x],
-        [y, y, y+width, y+width, y, y, y+width, y+width],
-        [z, z, z, z, z+height, z+height, z+height, z+height]
-    ]
-    
-    # Define the 6 faces (triangles)
-    i = [0, 0, 0, 1, 2, 4, 4, 6, 0, 1, 2, 4]
-    j = [1, 2, 4, 2, 3, 5, 6, 7, 4, 5, 6, 5]
-    k = [2, 3, 5, 3, 7, 6, 7, 3, 5, 6, 7, 7]
-    
+    v = _UNIT * (length, width, height) + (x, y, z)
     trace = go.Mesh3d(
-        x=vertices[0], y=vertices[1], z=vertices[2],
-        i=i, j=j, k=k,
+        x=v[:, 0], y=v[:, 1], z=v[:, 2],
+        i=_I, j=_J, k=_K,
         color=color,
         opacity=0.8,
         name=name,
@@ -171,21 +281,45 @@ def draw_container(container: Container):
         ([container.length, container.length], [container.width, container.width], [0, container.height]),
     ]
     
-    for ex, ey, ez in edges_lines:
-        fig.add_trace(go.Scatter3d(
-            x=ex, y=ey, z=ez,
-            mode='lines',
-            line=dict(color='black', width=3),
-            showlegend=False,
-            hoverinfo='skip'
+    # All 12 edges in a single trace, segments separated by None.
+    ex, ey, ez = [], [], []
+    for a, b, c in edges_lines:
+        ex.extend(a); ex.append(None)
+        ey.extend(b); ey.append(None)
+        ez.extend(c); ez.append(None)
+    fig.add_trace(go.Scatter3d(
+        x=ex, y=ey, z=ez,
+        mode='lines',
+        line=dict(color='black', width=3),
+        showlegend=False,
+        hoverinfo='skip'
+    ))
+
+    # Draw all items as one batched mesh: the shared unit-cube template
+    # is transformed across every item in a single broadcast.
+    if container.items:
+        origins = np.array([it.position for it in container.items], dtype=float)
+        dims = np.array([(it.length, it.width, it.height)
+                         for it in container.items], dtype=float)
+        verts = (_UNIT[None, :, :] * dims[:, None, :]
+                 + origins[:, None, :]).reshape(-1, 3)
+        offsets = (np.arange(len(container.items)) * 8)[:, None]
+        vcolors = np.repeat([it.color for it in container.items], 8)
+        vtext = np.repeat([it.name for it in container.items], 8)
+        fig.add_trace(go.Mesh3d(
+            x=verts[:, 0], y=verts[:, 1], z=verts[:, 2],
+            i=(offsets + _I).ravel(),
+            j=(offsets + _J).ravel(),
+            k=(offsets + _K).ravel(),
+            vertexcolor=vcolors,
+            opacity=0.8,
+            flatshading=True,
+            text=vtext,
+            hoverinfo='text',
+            name='Items',
+            showlegend=False
         ))
 
-    # Draw items
-    for item in container.items:
-        x, y, z = item.position
-        fig.add_trace(draw_box(x, y, z, item.length, item.width, item.height, 
-                              color=item.color, name=item.name, show_legend=True))
-
     fig.update_layout(
         scene=dict(
             aspectmode='data',
@@ -202,6 +336,21 @@ def draw_container(container: Container):
     return fig
 
 
+# ===================== CACHED PIPELINE =====================
+
+@st.cache_data
+def run_pack(L, W, H, MW, items_tuple):
+    """Pack the given items; memoized on container params + item specs."""
+    items = [Item(name, l, w, h, weight, qty, color=color)
+             for (name, l, w, h, weight, qty, color) in items_tuple]
+    return BinPacker(L, W, H, MW).pack(items)
+
+
+@st.cache_data
+def build_figure(L, W, H, MW, items_tuple):
+    return draw_container(run_pack(L, W, H, MW, items_tuple))
+
+
 # ===================== STREAMLIT UI =====================
 
 st.title("📦 FCL Container Loading Simulator")
@@ -214,21 +363,50 @@ MW = st.sidebar.number_input("Max Weight (kg)", value=28000)
 
 st.header("Items")
 
-if "item_list" not in st.session_state:
-    st.session_state.item_list=[]
+# Items are stored structure-of-arrays: one NumPy array per numeric
+# field plus plain lists for names and colors, which keeps session-state
+# serialization cheap and feeds the packer without rebuilding objects.
+def _empty_items():
+    return {
+        "names": [],
+        "lens": np.array([], dtype=np.int64),
+        "widths": np.array([], dtype=np.int64),
+        "heights": np.array([], dtype=np.int64),
+        "weights": np.array([], dtype=np.float64),
+        "qtys": np.array([], dtype=np.int64),
+        "colors": [],
+    }
+
+def _append_item(soa, name, length, width, height, weight, qty, color):
+    soa["names"].append(name)
+    soa["lens"] = np.append(soa["lens"], length)
+    soa["widths"] = np.append(soa["widths"], width)
+    soa["heights"] = np.append(soa["heights"], height)
+    soa["weights"] = np.append(soa["weights"], weight)
+    soa["qtys"] = np.append(soa["qtys"], qty)
+    soa["colors"].append(color)
+
+def _items_tuple(soa):
+    return tuple(zip(soa["names"],
+                     soa["lens"].tolist(), soa["widths"].tolist(),
+                     soa["heights"].tolist(), soa["weights"].tolist(),
+                     soa["qtys"].tolist(), soa["colors"]))
+
+if "items" not in st.session_state:
+    st.session_state["items"] = _empty_items()
 
 # ---------- Dummy Data Button ----------
 if st.button("🧪 Isi Dummy Data"):
-    st.session_state.item_list = [
-        Item("Box Small", 50, 40, 30, 10, quantity=5, color="#FF6B6B"),
-        Item("Box Medium", 80, 60, 50, 25, quantity=3, color="#4ECDC4"),
-        Item("Sack", 100, 45, 30, 45, quantity=2, color="#95E1D3"),
-        Item("Big Crate", 120, 100, 90, 80, quantity=1, color="#FFA07A"),
-    ]
+    soa = _empty_items()
+    _append_item(soa, "Box Small", 50, 40, 30, 10, 5, "#FF6B6B")
+    _append_item(soa, "Box Medium", 80, 60, 50, 25, 3, "#4ECDC4")
+    _append_item(soa, "Sack", 100, 45, 30, 45, 2, "#95E1D3")
+    _append_item(soa, "Big Crate", 120, 100, 90, 80, 1, "#FFA07A")
+    st.session_state["items"] = soa
     st.success("Dummy items loaded!")
 
 if st.button("🗑 Clear Items"):
-    st.session_state.item_list=[]
+    st.session_state["items"] = _empty_items()
 
 # ---------- Add Item Form ----------
 with st.form("add_item"):
@@ -242,16 +420,29 @@ with st.form("add_item"):
     color=c3.color_picker("Color", "#FF6B6B")
 
     if st.form_submit_button("Add Item"):
-        st.session_state.item_list.append(Item(name,length,width,height,weight,qty,color=color))
+        _append_item(st.session_state["items"],
+                     name, length, width, height, weight, qty, color)
 
 # ---------- Show Items ----------
-for it in st.session_state.item_list:
-    st.write(f"📦 {it.name} | {it.quantity} pcs | {it.length}x{it.width}x{it.height} cm")
+_soa = st.session_state["items"]
+for name, l, w, h, qty in zip(_soa["names"], _soa["lens"], _soa["widths"],
+                              _soa["heights"], _soa["qtys"]):
+    st.write(f"📦 {name} | {qty} pcs | {l}x{w}x{h} cm")
 
 # ---------- Run Packing ----------
 if st.button("🚀 Run Packing"):
-    packer=BinPacker(L,W,H,MW)
-    container=packer.pack(st.session_state.item_list)
+    items_tuple = _items_tuple(st.session_state["items"])
+    container = run_pack(L, W, H, MW, items_tuple)
 
     st.success(f"Packed {len(container.items)} items | Weight {container.current_weight:.1f} kg")
-    st.plotly_chart(draw_container(container), use_container_width=True)
\ No newline at end of file
+
+    # Keep the built figure in session state so reruns with an unchanged
+    # input hash skip figure construction (and the cache round-trip)
+    # entirely; the fixed key lets Streamlit reuse the chart component.
+    fig_key = hash((L, W, H, MW, items_tuple))
+    cached = st.session_state.get("_fig_cache")
+    if cached is None or cached[0] != fig_key:
+        st.session_state._fig_cache = (fig_key,
+                                       build_figure(L, W, H, MW, items_tuple))
+    st.plotly_chart(st.session_state._fig_cache[1],
+                    use_container_width=True, key="pack_viz")
\ No newline at end of file
@@ -0,0 +1,40 @@
+from streamlit_app import BinPacker, Item
+
+
+def test_settle_keeps_elevated_stacking_spot():
+    # Corner (50, 0, 80) on top of the tall item must survive settling:
+    # its neighbours at that height are all shorter, so an unguarded
+    # shift toward the wall would tunnel through open space and delete
+    # the only candidate that allows stacking there.
+    items = [
+        Item("base", 50, 100, 30, 100),
+        Item("tall", 50, 100, 80, 50),
+        Item("top", 50, 100, 20, 1, quantity=4),
+    ]
+    container = BinPacker(100, 100, 100, 10000).pack(items)
+    assert len(container.items) == 6
+    assert (50, 0, 80) in [it.position for it in container.items]
+
+
+def test_packed_items_stay_valid():
+    items = [
+        Item("Box Small", 50, 40, 30, 10, quantity=5),
+        Item("Box Medium", 80, 60, 50, 25, quantity=3),
+        Item("Sack", 100, 45, 30, 45, quantity=2),
+        Item("Big Crate", 120, 100, 90, 80, quantity=1),
+    ]
+    container = BinPacker(590, 235, 239, 28000).pack(items)
+    assert len(container.items) == 11
+    boxes = []
+    for it in container.items:
+        x, y, z = it.position
+        assert 0 <= x and 0 <= y and 0 <= z
+        assert x + it.length <= 590
+        assert y + it.width <= 235
+        assert z + it.height <= 239
+        boxes.append((x, y, z, x + it.length, y + it.width, z + it.height))
+    for i, a in enumerate(boxes):
+        for b in boxes[i + 1:]:
+            assert (a[3] <= b[0] or a[0] >= b[3] or
+                    a[4] <= b[1] or a[1] >= b[4] or
+                    a[5] <= b[2] or a[2] >= b[5])